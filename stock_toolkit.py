@@ -2,133 +2,475 @@
 # A comprehensive, command-line-driven tool for stock analysis.
 
 import argparse
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 import yfinance as yf
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 
+# matplotlib and seaborn are imported lazily inside the plot_* functions:
+# loading the plot stack costs hundreds of ms and tens of MB, which the
+# non-plotting uses of this module should not pay.
+
+# Numba is optional: when present, the hot SMA/RSI loops below are JIT-compiled
+# into single-pass native kernels; otherwise we fall back to the NumPy paths.
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# bottleneck is likewise optional: its C move_mean is the fastest rolling-mean
+# implementation available and wins over the other SMA paths when installed.
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
 # ==============================================================================
 # MODULE 1: DATA FETCHER
 # Responsible for all interactions with the yfinance API.
 # ==============================================================================
 
-def fetch_stock_data(tickers, start_date, end_date):
+# Yahoo serves at most ~20 tickers per request URL, so downloads are chunked
+# at that size and the chunks fetched concurrently.
+CHUNK_SIZE = 20
+MAX_FETCH_WORKERS = 8
+FETCH_RETRIES = 3
+
+# On-disk OHLCV cache: one Parquet file per ticker plus a JSON sidecar
+# recording the date span it covers, so repeat runs over the same (or a
+# narrower) range skip the network entirely.
+CACHE_DIR = os.path.expanduser('~/.stock_cache')
+
+def _cache_paths(ticker):
+    """Returns the (parquet, sidecar) cache paths for a ticker."""
+    safe = ticker.replace('/', '_')
+    return (os.path.join(CACHE_DIR, f'{safe}.parquet'),
+            os.path.join(CACHE_DIR, f'{safe}.json'))
+
+def _load_cached(ticker, start_date, end_date, fields, auto_adjust):
+    """
+    Loads a ticker's OHLCV frame from the cache if the cached span covers
+    [start_date, end_date] and the entry matches the requested adjustment
+    mode and fields. Returns the sliced frame, or None on a miss.
+    """
+    data_path, meta_path = _cache_paths(ticker)
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        # ISO dates compare correctly as strings.
+        if (meta['start'] <= start_date and meta['end'] >= end_date
+                and meta.get('auto_adjust', False) == auto_adjust):
+            frame = pd.read_parquet(data_path)
+            if fields is not None:
+                if not set(fields).issubset(frame.columns):
+                    return None
+                frame = frame[fields]
+            # yf.download treats `end` as exclusive; slice the same way so
+            # warm- and cold-cache runs return identical rows.
+            return frame[(frame.index >= start_date) & (frame.index < end_date)]
+    except Exception:
+        pass  # Any unreadable cache entry is simply a miss.
+    return None
+
+def _store_cached(ticker, frame, start_date, end_date, auto_adjust):
+    """Writes a ticker's OHLCV frame and covered span to the cache."""
+    data_path, meta_path = _cache_paths(ticker)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write to a temp file and rename so a concurrent CLI invocation
+        # never observes a half-written cache entry.
+        tmp_path = data_path + '.tmp'
+        frame.to_parquet(tmp_path)
+        os.replace(tmp_path, data_path)
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump({'start': start_date, 'end': end_date, 'auto_adjust': auto_adjust}, f)
+        os.replace(meta_path + '.tmp', meta_path)
+    except Exception:
+        # Caching is best-effort; never fail the fetch over it. In particular
+        # to_parquet raises ImportError when no parquet engine is installed.
+        pass
+
+def _download_chunk(chunk, start_date, end_date, auto_adjust):
+    """Downloads one chunk of tickers, retrying with exponential backoff."""
+    for attempt in range(FETCH_RETRIES):
+        try:
+            return yf.download(chunk, start=start_date, end=end_date,
+                               group_by='ticker', progress=False, threads=False,
+                               auto_adjust=auto_adjust, actions=False)
+        except Exception:
+            if attempt == FETCH_RETRIES - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+def fetch_stock_data(tickers, start_date, end_date, fields=None, auto_adjust=False):
     """
     Fetches historical stock data for given tickers from Yahoo Finance.
-    
+
     Args:
         tickers (list): A list of stock ticker symbols.
         start_date (str): The start date for the data in 'YYYY-MM-DD' format.
         end_date (str): The end date for the data in 'YYYY-MM-DD' format.
+        fields (list): Optional subset of fields to return (e.g. ['Close']).
+                       Everything downloaded is still cached in full.
+        auto_adjust (bool): Fold dividend/split adjustments into Close
+                            (drops the separate 'Adj Close' column).
 
     Returns:
         pandas.DataFrame: A DataFrame containing the OHLCV data for the tickers,
                           or an empty DataFrame if fetching fails.
     """
     print(f"\n[*] Fetching data for {', '.join(tickers)} from {start_date} to {end_date}...")
+
+    # Serve tickers from the on-disk cache where possible; only the rest
+    # go over the network.
+    cached = {}
+    missing = []
+    for ticker in tickers:
+        frame = _load_cached(ticker, start_date, end_date, fields, auto_adjust)
+        if frame is not None:
+            cached[ticker] = frame
+        else:
+            missing.append(ticker)
+    if cached:
+        print(f"[*] Loaded {', '.join(cached)} from cache.")
+
     try:
-        # Download full OHLCV (Open, High, Low, Close, Volume) data
-        # group_by='ticker' is essential for handling multiple tickers correctly.
-        stock_data = yf.download(tickers, start=start_date, end=end_date, group_by='ticker', progress=False)
-        
-        if stock_data.empty:
+        pieces = []
+        if missing:
+            # Download full OHLCV (Open, High, Low, Close, Volume) data.
+            # group_by='ticker' is essential for handling multiple tickers correctly.
+            # Chunks are fetched in parallel so wall-clock time is bounded by the
+            # slowest request rather than the sum of all round-trips.
+            chunks = [missing[i:i + CHUNK_SIZE] for i in range(0, len(missing), CHUNK_SIZE)]
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(chunks))) as executor:
+                futures = [executor.submit(_download_chunk, chunk, start_date, end_date, auto_adjust)
+                           for chunk in chunks]
+                results = [future.result() for future in futures]
+            fetched = results[0] if len(results) == 1 else pd.concat(results, axis=1)
+
+            if not fetched.empty:
+                # Drop tickers that have no data (all NaN columns)
+                fetched.dropna(axis=1, how='all', inplace=True)
+                for ticker in fetched.columns.get_level_values(0).unique():
+                    _store_cached(ticker, fetched[ticker], start_date, end_date, auto_adjust)
+                # The full download is cached above; the working frame keeps
+                # only the fields this analysis actually reads.
+                if fields is not None and not fetched.empty:
+                    fetched = fetched.loc[:, pd.IndexSlice[:, fields]]
+                if not fetched.empty:
+                    pieces.append(fetched)
+
+        if cached:
+            pieces.append(pd.concat(cached, axis=1))
+
+        if not pieces:
             print("❌ Error: No data found. Please check tickers and date range.")
             return pd.DataFrame()
 
-        # Drop tickers that have no data (all NaN columns)
-        stock_data.dropna(axis=1, how='all', inplace=True)
+        stock_data = pieces[0] if len(pieces) == 1 else pd.concat(pieces, axis=1)
         if stock_data.empty:
             print("❌ Error: All specified tickers were invalid or had no data for the period.")
             return pd.DataFrame()
 
+        # Narrow to float32: prices fit comfortably in single precision, and
+        # halving the bytes halves memory bandwidth for the rolling math,
+        # which is memory-bound. Correlation promotes back to float64 for
+        # its accumulation where the precision actually matters.
+        float_cols = stock_data.select_dtypes('float64').columns
+        if len(float_cols):
+            stock_data[float_cols] = stock_data[float_cols].astype(np.float32)
+
         print("✅ Data fetched successfully.")
         return stock_data
     except Exception as e:
         print(f"❌ An unexpected error occurred during data fetching: {e}")
         return pd.DataFrame()
 
+@dataclass
+class OHLCV:
+    """
+    Structure-of-arrays view of fetched stock data: one (dates, tickers,
+    fields) float32 cube, so analysis code slices a contiguous matrix per
+    field instead of traversing the MultiIndex columns with xs() each time.
+    """
+    dates: pd.DatetimeIndex
+    tickers: list
+    fields: list
+    values: np.ndarray  # shape (n_dates, n_tickers, n_fields)
+
+    @classmethod
+    def from_dataframe(cls, stock_data):
+        """Builds the cube from a (ticker, field) MultiIndex frame."""
+        tickers = list(stock_data.columns.get_level_values(0).unique())
+        fields = list(stock_data.columns.get_level_values(1).unique())
+        values = np.empty((len(stock_data.index), len(tickers), len(fields)), dtype=np.float32)
+        for j, field in enumerate(fields):
+            values[:, :, j] = stock_data.xs(field, level=1, axis=1).reindex(columns=tickers).to_numpy()
+        return cls(stock_data.index, tickers, fields, values)
+
+    def field(self, name):
+        """Returns the (dates, tickers) matrix for one field, contiguous."""
+        return np.ascontiguousarray(self.values[:, :, self.fields.index(name)])
+
+    def close(self):
+        return self.field('Close')
+
 # ==============================================================================
 # MODULE 2: ANALYSIS
 # Contains all financial calculation logic.
 # ==============================================================================
 
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _running_smas_kernel(close, windows):
+        """All requested SMA windows in one left-to-right sweep: each window
+        keeps a running sum and valid-sample count, adding the newest sample
+        and dropping the one falling out of its window. NaN closes stay out
+        of the sums, so a gap only masks the windows containing it — the
+        min_count=window semantics of rolling(w).mean() and move_mean."""
+        n = close.shape[0]
+        k = windows.shape[0]
+        out = np.full((n, k), np.nan)
+        sums = np.zeros(k)
+        counts = np.zeros(k, dtype=np.int64)
+        for i in range(n):
+            new_valid = not np.isnan(close[i])
+            for j in range(k):
+                if new_valid:
+                    sums[j] += close[i]
+                    counts[j] += 1
+                if i >= windows[j] and not np.isnan(close[i - windows[j]]):
+                    sums[j] -= close[i - windows[j]]
+                    counts[j] -= 1
+                if counts[j] == windows[j]:
+                    out[i, j] = sums[j] / windows[j]
+        return out
+
+    # No fastmath here: these kernels rely on NaN comparisons, which
+    # fastmath's finite-math assumption would break.
+    @njit(cache=True)
+    def _rsi_kernel(close, window):
+        """Wilder's RSI as a single streaming recursion over the Close array,
+        matching ewm(alpha=1/window, adjust=False, min_periods=window): the
+        first price change seeds the averages, output starts once `window`
+        changes have been seen, and NaN closes are skipped."""
+        n = close.shape[0]
+        rsi = np.full(n, np.nan)
+        alpha = 1.0 / window
+        avg_gain = 0.0
+        avg_loss = 0.0
+        count = 0
+        prev = np.nan
+        for i in range(n):
+            if np.isnan(close[i]):
+                continue
+            if not np.isnan(prev):
+                delta = close[i] - prev
+                gain = delta if delta > 0 else 0.0
+                loss = -delta if delta < 0 else 0.0
+                if count == 0:
+                    avg_gain = gain
+                    avg_loss = loss
+                else:
+                    avg_gain += alpha * (gain - avg_gain)
+                    avg_loss += alpha * (loss - avg_loss)
+                count += 1
+                if count >= window:
+                    if avg_loss == 0:
+                        rsi[i] = 100.0  # all gains, no losses
+                    else:
+                        rsi[i] = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+            prev = close[i]
+        return rsi
+
 def calculate_moving_averages(data, ticker, windows):
     """Calculates Simple Moving Averages (SMA) for a given stock."""
-    for window in windows:
-        data[(ticker, f'SMA_{window}')] = data[(ticker, 'Close')].rolling(window=window).mean()
-    return data
+    close = data[(ticker, 'Close')].to_numpy()
+
+    new_cols = {}
+    if BOTTLENECK_AVAILABLE:
+        # C-level rolling mean with Kahan-style summation; this is the same
+        # fast path pandas itself prefers, minus the pandas dispatch on top.
+        for window in windows:
+            new_cols[(ticker, f'SMA_{window}')] = bn.move_mean(close, window=window, min_count=window)
+    elif NUMBA_AVAILABLE:
+        smas = _running_smas_kernel(close, np.asarray(windows, dtype=np.int64))
+        for j, window in enumerate(windows):
+            new_cols[(ticker, f'SMA_{window}')] = smas[:, j]
+    else:
+        # One prefix-sum pass serves every window: SMA_w is just a difference
+        # of cumulative sums, so we avoid a pandas rolling scan per window.
+        # NaNs are summed as zero alongside a valid-count prefix sum, so a
+        # missing close (late IPO, calendar gap) only masks the windows that
+        # contain it instead of poisoning the whole cumsum — the same
+        # semantics as rolling(w).mean() and move_mean(min_count=w).
+        valid = ~np.isnan(close)
+        cumsum = np.concatenate(([0.0], np.cumsum(np.where(valid, close, 0.0))))
+        cumcnt = np.concatenate(([0], np.cumsum(valid)))
+        for window in windows:
+            sma = np.full_like(close, np.nan)
+            full_window = (cumcnt[window:] - cumcnt[:-window]) == window
+            sma[window - 1:] = np.where(full_window,
+                                        (cumsum[window:] - cumsum[:-window]) / window,
+                                        np.nan)
+            new_cols[(ticker, f'SMA_{window}')] = sma
+
+    # Insert all SMA columns in a single concat: per-column assignment into a
+    # MultiIndex frame re-consolidates the BlockManager on every insert.
+    return pd.concat([data, pd.DataFrame(new_cols, index=data.index)], axis=1)
 
 def calculate_rsi(data, ticker, window=14):
-    """Calculates the Relative Strength Index (RSI)."""
-    delta = data[(ticker, 'Close')].diff(1)
-    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-    
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
+    """Calculates the Relative Strength Index (RSI) using Wilder's smoothing."""
+    close = data[(ticker, 'Close')].to_numpy()
+
+    if NUMBA_AVAILABLE:
+        data[(ticker, 'RSI')] = _rsi_kernel(close, window)
+        return data
+
+    # Work on the raw ndarray: one diff pass, no masked Series copies.
+    # Compute on the NaN-compressed series and scatter back, so each price
+    # change bridges from the previous *valid* close — the same gap
+    # semantics as the Numba kernel, which skips NaN closes outright.
+    valid = ~np.isnan(close)
+    compact = close[valid]
+
+    delta = np.full_like(compact, np.nan)
+    if compact.size:
+        delta[1:] = np.diff(compact)
+    # np.maximum is a branchless SIMD ufunc; no mask or compare temporaries.
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+
+    # Wilder's RMA is an EWM with alpha = 1/window (the TradingView convention),
+    # not a simple rolling mean.
+    avg_gain = pd.Series(gain).ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+    avg_loss = pd.Series(loss).ewm(alpha=1 / window, adjust=False, min_periods=window).mean().to_numpy()
+
+    # Guard zero average loss branchlessly: divide by a safe stand-in, then
+    # overwrite those positions with RSI 100 (all gains, no losses). No
+    # divide-by-zero warning and no Python-level conditional.
+    safe_loss = np.where(avg_loss == 0, 1.0, avg_loss)
+    compact_rsi = 100.0 - 100.0 / (1.0 + avg_gain / safe_loss)
+    compact_rsi = np.where(avg_loss == 0, 100.0, compact_rsi)
+
+    rsi = np.full_like(close, np.nan)
+    rsi[valid] = compact_rsi
     data[(ticker, 'RSI')] = rsi
     return data
 
-def calculate_performance(data):
+def calculate_performance(ohlcv):
     """Normalizes stock prices to 100 to compare performance."""
-    # Using 'Adj Close' is better for performance comparison as it accounts for dividends/splits
-    adj_close = data.xs('Adj Close', level=1, axis=1)
-    return (adj_close / adj_close.iloc[0] * 100)
+    # 'Adj Close' accounts for dividends/splits; auto-adjusted fetches fold
+    # those adjustments into Close and drop the separate column.
+    prices = ohlcv.field('Adj Close' if 'Adj Close' in ohlcv.fields else 'Close')
+
+    # One streaming multiply over the raw ndarray: fold the x100 into a
+    # per-ticker reciprocal of the first row (a multiply is cheaper than a
+    # divide), with zero bases guarded to NaN instead of raising.
+    base = np.where(prices[0] == 0, np.nan, prices[0])
+    return pd.DataFrame(prices * (100.0 / base), index=ohlcv.dates, columns=ohlcv.tickers)
 
-def calculate_correlation(data):
+def calculate_correlation(ohlcv):
     """Calculates the correlation matrix for the closing prices of the stocks."""
-    close_prices = data.xs('Close', level=1, axis=1)
-    return close_prices.corr()
+    # Pearson correlation as one BLAS-backed contraction on the centered,
+    # unit-norm price matrix, instead of DataFrame.corr()'s pairwise loops.
+    # Prices are stored as float32, but the centered sums accumulate in
+    # float64 to keep the correlation numerically stable.
+    prices = ohlcv.close().astype(np.float64)
+    prices = prices[~np.isnan(prices).any(axis=1)]
+    centered = prices - prices.mean(axis=0)
+    # A constant price column has zero norm; divide by NaN instead so it
+    # correlates as NaN (like DataFrame.corr()) without a RuntimeWarning.
+    norm = np.sqrt((centered * centered).sum(axis=0))
+    normed = centered / np.where(norm == 0, np.nan, norm)
+    corr = np.einsum('ij,ik->jk', normed, normed, optimize=True)
+    return pd.DataFrame(corr, index=ohlcv.tickers, columns=ohlcv.tickers)
 
 # ==============================================================================
 # MODULE 3: PLOTTING
 # Manages all matplotlib and seaborn visualizations.
 # ==============================================================================
 
-def plot_full_analysis(data, ticker, ma_windows):
+_ACTIVE_PLOT_STYLE = None
+
+def _apply_plot_style(plt, style):
+    """Applies a matplotlib style; repeat calls with the same style are no-ops."""
+    global _ACTIVE_PLOT_STYLE
+    if style != _ACTIVE_PLOT_STYLE:
+        plt.style.use(style)
+        _ACTIVE_PLOT_STYLE = style
+
+def plot_full_analysis(data, tickers, ma_windows):
     """
-    Generates a comprehensive 3-panel plot: Price/MAs, Volume, and RSI.
+    Generates a comprehensive 3-panel analysis (Price/MAs, Volume, RSI) for
+    each ticker, drawn as columns of a single shared Figure.
     """
-    print(f"[*] Generating full analysis plot for {ticker}...")
-    
-    fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(16, 12), sharex=True, 
-                                        gridspec_kw={'height_ratios': [3, 1, 1]})
-    plt.style.use('seaborn-v0_8-darkgrid')
-    
-    # Panel 1: Price and Moving Averages
-    ax1.plot(data.index, data[(ticker, 'Close')], label='Close Price', color='blue')
-    for window in ma_windows:
-        ax1.plot(data.index, data[(ticker, f'SMA_{window}')], label=f'SMA {window}', linestyle='--')
-    ax1.set_title(f'Full Analysis for {ticker}', fontsize=16)
-    ax1.set_ylabel('Price (USD)', fontsize=12)
-    ax1.legend()
-    ax1.grid(True)
-
-    # Panel 2: Volume
-    ax2.bar(data.index, data[(ticker, 'Volume')], color='gray', alpha=0.6)
-    ax2.set_ylabel('Volume', fontsize=12)
-    ax2.grid(True)
-
-    # Panel 3: RSI
-    ax3.plot(data.index, data[(ticker, 'RSI')], label='RSI', color='purple')
-    ax3.axhline(70, color='red', linestyle='--', linewidth=1, label='Overbought (70)')
-    ax3.axhline(30, color='green', linestyle='--', linewidth=1, label='Oversold (30)')
-    ax3.set_ylabel('RSI', fontsize=12)
-    ax3.set_xlabel('Date', fontsize=12)
-    ax3.legend()
-    ax3.grid(True)
-    
-    plt.xticks(rotation=45)
+    import matplotlib.pyplot as plt
+
+    print(f"[*] Generating full analysis plot for {', '.join(tickers)}...")
+
+    # One Figure for all tickers: the backend/layout setup cost amortizes
+    # across columns instead of being paid once per ticker.
+    n = len(tickers)
+    fig, axes = plt.subplots(3, n, figsize=(16 if n == 1 else 8 * n, 12),
+                             sharex='col', squeeze=False,
+                             gridspec_kw={'height_ratios': [3, 1, 1]})
+    _apply_plot_style(plt, 'seaborn-v0_8-darkgrid')
+
+    dates = data.index
+    for col, ticker in enumerate(tickers):
+        ax1, ax2, ax3 = axes[0][col], axes[1][col], axes[2][col]
+
+        # One MultiIndex lookup per column, then plain ndarrays for every
+        # panel: each data[(ticker, ...)] access hashes a tuple key.
+        close = data[(ticker, 'Close')].to_numpy()
+        volume = data[(ticker, 'Volume')].to_numpy()
+        rsi = data[(ticker, 'RSI')].to_numpy()
+        smas = {window: data[(ticker, f'SMA_{window}')].to_numpy() for window in ma_windows}
+
+        # Panel 1: Price and Moving Averages
+        ax1.plot(dates, close, label='Close Price', color='blue', rasterized=True)
+        for window in ma_windows:
+            ax1.plot(dates, smas[window], label=f'SMA {window}', linestyle='--')
+        ax1.set_title(f'Full Analysis for {ticker}', fontsize=16)
+        ax1.set_ylabel('Price (USD)', fontsize=12)
+        ax1.legend()
+        ax1.grid(True)
+
+        # Panel 2: Volume. fill_between draws one PolyCollection instead of
+        # the one Rectangle patch per trading day that ax.bar would create.
+        ax2.fill_between(dates, 0, volume,
+                         step='mid', color='gray', alpha=0.6, linewidth=0, rasterized=True)
+        ax2.set_ylabel('Volume', fontsize=12)
+        ax2.grid(True)
+
+        # Panel 3: RSI
+        ax3.plot(dates, rsi, label='RSI', color='purple', rasterized=True)
+        ax3.axhline(70, color='red', linestyle='--', linewidth=1, label='Overbought (70)')
+        ax3.axhline(30, color='green', linestyle='--', linewidth=1, label='Oversold (30)')
+        ax3.set_ylabel('RSI', fontsize=12)
+        ax3.set_xlabel('Date', fontsize=12)
+        ax3.legend()
+        ax3.grid(True)
+        ax3.tick_params(axis='x', rotation=45)
+
     plt.tight_layout()
     print("✅ Plot generated.")
     plt.show()
 
 def plot_performance_comparison(performance_data):
     """Plots the normalized performance of multiple stocks."""
+    import matplotlib.pyplot as plt
+
     print("[*] Generating performance comparison plot...")
-    plt.style.use('seaborn-v0_8-darkgrid')
+    _apply_plot_style(plt, 'seaborn-v0_8-darkgrid')
     fig, ax = plt.subplots(figsize=(14, 7))
     
     performance_data.plot(ax=ax)
@@ -143,18 +485,35 @@ def plot_performance_comparison(performance_data):
     print("✅ Plot generated.")
     plt.show()
 
+# Above this many tickers the per-cell annotations dominate render time,
+# so the heatmap falls back to a plain pixel image without annotations.
+HEATMAP_ANNOT_LIMIT = 20
+
 def plot_correlation_heatmap(correlation_data):
     """Plots the correlation matrix as a heatmap."""
+    import matplotlib.pyplot as plt
+
     print("[*] Generating correlation heatmap...")
     if correlation_data.shape[0] < 2:
         print("⚠️ Warning: Correlation requires at least 2 tickers. Skipping heatmap.")
         return
-        
-    plt.style.use('seaborn-v0_8-whitegrid')
+
+    _apply_plot_style(plt, 'seaborn-v0_8-whitegrid')
     fig, ax = plt.subplots(figsize=(10, 8))
-    
-    sns.heatmap(correlation_data, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5, ax=ax)
-    
+
+    n_tickers = correlation_data.shape[0]
+    if n_tickers > HEATMAP_ANNOT_LIMIT:
+        # Wide matrix: one imshow pixel write instead of K*K Text artists.
+        im = ax.imshow(correlation_data.to_numpy(), cmap='coolwarm', vmin=-1, vmax=1)
+        fig.colorbar(im, ax=ax)
+        ax.set_xticks(range(n_tickers))
+        ax.set_xticklabels(correlation_data.columns)
+        ax.set_yticks(range(n_tickers))
+        ax.set_yticklabels(correlation_data.columns)
+    else:
+        import seaborn as sns
+        sns.heatmap(correlation_data, annot=True, cmap='coolwarm', fmt=".2f", linewidths=.5, ax=ax)
+
     ax.set_title('Stock Correlation Matrix', fontsize=16)
     plt.xticks(rotation=45, ha='right')
     plt.yticks(rotation=0)
@@ -222,8 +581,15 @@ def main():
     tickers = [ticker.strip().upper() for ticker in args.tickers.split(',')]
     ma_windows = [int(w.strip()) for w in args.ma_windows.split(',')]
     
-    # Fetch data once
-    stock_data = fetch_stock_data(tickers, args.start_date, args.end_date)
+    # Fetch data once, requesting only the fields the chosen analysis reads.
+    # 'compare'/'corr' use a single price series, so auto_adjust folds the
+    # dividend/split adjustments into Close and the other columns are dropped.
+    if args.analysis == 'full':
+        fetch_fields, auto_adjust = ['Close', 'Volume'], False
+    else:
+        fetch_fields, auto_adjust = ['Close'], True
+    stock_data = fetch_stock_data(tickers, args.start_date, args.end_date,
+                                  fields=fetch_fields, auto_adjust=auto_adjust)
     
     if stock_data.empty:
         print("\n--- Analysis Aborted ---")
@@ -231,34 +597,21 @@ def main():
 
     # Execute the chosen analysis
     if args.analysis == 'full':
-        if len(tickers) > 1:
-             # For multiple tickers, data is multi-indexed. We need to process each one.
-            for ticker in tickers:
-                # Create a temporary DataFrame for a single ticker's data
-                single_ticker_data = stock_data[ticker].to_frame().unstack(level=0)
-                single_ticker_data.columns = single_ticker_data.columns.droplevel(0)
-                
-                # Perform analysis
-                data_with_ma = calculate_moving_averages(single_ticker_data.copy(), '', ma_windows)
-                data_with_rsi = calculate_rsi(data_with_ma, '')
-                
-                # Reconstruct column names for plotting
-                data_with_rsi.columns = pd.MultiIndex.from_product([[ticker], data_with_rsi.columns])
-                
-                plot_full_analysis(data_with_rsi, ticker, ma_windows)
-        else:
-            # Single ticker case is simpler
-            ticker = tickers[0]
-            data_with_ma = calculate_moving_averages(stock_data.copy(), ticker, ma_windows)
-            data_with_rsi = calculate_rsi(data_with_ma, ticker)
-            plot_full_analysis(data_with_rsi, ticker, ma_windows)
+        # Columns are already keyed by (ticker, field), and the indicator
+        # helpers pull each field out as a contiguous ndarray themselves, so
+        # we compute in place on the shared frame instead of copying each
+        # ticker's data out and rebuilding a MultiIndex around the results.
+        for ticker in tickers:
+            stock_data = calculate_moving_averages(stock_data, ticker, ma_windows)
+            stock_data = calculate_rsi(stock_data, ticker)
+        plot_full_analysis(stock_data, tickers, ma_windows)
 
     elif args.analysis == 'compare':
-        performance_data = calculate_performance(stock_data)
+        performance_data = calculate_performance(OHLCV.from_dataframe(stock_data))
         plot_performance_comparison(performance_data)
-        
+
     elif args.analysis == 'corr':
-        correlation_data = calculate_correlation(stock_data)
+        correlation_data = calculate_correlation(OHLCV.from_dataframe(stock_data))
         plot_correlation_heatmap(correlation_data)
 
     print("\n--- Analysis Complete ---")